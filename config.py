@@ -9,12 +9,33 @@ LOG_METADATA = False  # Toggle to enable or disable metadata logging
 DEFAULT_SCALE_WIDTH = 640  # Default width for scaling videos
 DEFAULT_SCALE_HEIGHT = 640  # Default height for scaling videos
 WEBM_BITRATE = '1M'  # Bitrate for WebM compression
+V_CODEC_WEBM = 'libvpx'  # Video codec for WebM, replaced by an available one if ffmpeg lacks it
+A_CODEC_WEBM = 'libvorbis'  # Audio codec for WebM, replaced by an available one if ffmpeg lacks it
 
 USE_THREAD_POOL_FOR_IMAGES = True  # Toggle to use ThreadPoolExecutor for image processing
 USE_THREAD_POOL_FOR_VIDEOS = False  # Toggle to use ThreadPoolExecutor for video processing
 
 ENABLE_DEPENDENCY_CHECK = True  # Toggle to enable or disable dependency checks
+PROBE_CAPABILITIES = True  # Toggle to probe encoder capabilities before processing
+CWEBP_MULTITHREAD = None  # Pass -mt to cwebp, None enables it when the capability probe reports support
+
+MEMORY_BUDGET_BYTES = None  # Projected memory allowed for running jobs, None uses MEMORY_BUDGET_FRACTION of physical memory, 0 disables
+MEMORY_BUDGET_FRACTION = 0.6  # Share of physical memory used when MEMORY_BUDGET_BYTES is None
+IMAGE_BYTES_PER_PIXEL = 8  # Decoded RGBA bitmap plus the encoder's working copy
+VIDEO_FRAME_BUFFERS = 32  # Decoded frames held by ffmpeg's decoder, filters and encoder lookahead
+JOB_BASE_BYTES = 64 * 1024 ** 2  # Fixed overhead per encoder process
+
+DUPLICATE_POLICY = None  # Near-duplicate images: None skips the analysis, 'report' logs them, 'lowerQuality' encodes all but the best copy at DUPLICATE_WEBP_QUALITY
+DUPLICATE_HASH = 'phash'  # Perceptual hash used for near-duplicate detection, 'phash' or 'dhash'
+DUPLICATE_MAX_DISTANCE = 6  # Maximum Hamming distance between two 64-bit hashes to count as near-duplicates
+DUPLICATE_WEBP_QUALITY = '60'  # Quality for WebP compression of near-duplicates under the 'lowerQuality' policy
+DUPLICATE_BATCH_SIZE = 256  # Images hashed per vectorized batch
+
+STAGING_DIR = None  # Local scratch folder (tmpfs/SSD) for inputs on network volumes, None processes files in place
+STAGING_MAX_BYTES = 2 * 1024 ** 3  # Upper bound for bytes held in the scratch folder
+STAGING_READ_AHEAD = 8  # Number of inputs copied to the scratch folder ahead of the encoders
 
 # Adjust creation flags based on the operating system and toggle
 import os
 CREATE_NO_WINDOW = 0x08000000 if HIDE_CMD_WINDOWS and os.name == 'nt' else 0
+CAPABILITY_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'simplecompress', 'capabilities.json')  # Cached tool probes keyed by binary path and mtime
@@ -1,31 +1,25 @@
-import os
-import sys
-import shutil
-import threading  # Import threading for key listener
-from pathlib import Path
+import argparse  # Import argparse for the non-interactive flags
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-from tqdm import tqdm
-import importlib  # Import importlib to check for module availability
 import logging  # Import logging module
 
 from utils.console_utils import clearConsole
-from utils.video_utils import processVideo, getVideoDimensions
-from utils.image_utils import processImage
-from utils.file_utils import moveUnpairedFiles
-from utils.progress_utils import updateProgressBar
+from utils.compress_utils import collectFiles, compressTree
+from utils.estimate_utils import estimateTree, formatEstimate
+from utils.settings_utils import resolveSettings
+from utils.capability_utils import getCapabilities
 from config import CRF_WEBM, WEBP_QUALITY, HIDE_CMD_WINDOWS, MOVE_ORIGINALS_TO_BACKUP, LOG_FILE, CREATE_NO_WINDOW
 from config import USE_THREAD_POOL_FOR_IMAGES, USE_THREAD_POOL_FOR_VIDEOS, ENABLE_DEPENDENCY_CHECK, LOG_METADATA  # Removed ENABLE_KEYBOARD_CHECK
 from utils.dependency_utils import checkDependencies  # Import the moved function
 
-# Configure logging
-logging.basicConfig(
-  filename=LOG_FILE,  # Log file path
-  level=logging.INFO,  # Set default log level to INFO
-  format='%(asctime)s - %(levelname)s - %(message)s'  # Log format with timestamp, level, and message
-)
+def configureLogging():
+  # Only the command line configures logging, library callers keep control of the root logger
+  logging.basicConfig(
+    filename=LOG_FILE,  # Log file path
+    level=logging.INFO,  # Set default log level to INFO
+    format='%(asctime)s - %(levelname)s - %(message)s'  # Log format with timestamp, level, and message
+  )
 
-def logConstants():
+def logConstants(settings=None):
   constants = {
     'CRF_WEBM': CRF_WEBM,
     'WEBP_QUALITY': WEBP_QUALITY,
@@ -45,88 +39,102 @@ def logConstants():
     print(f'{key}: {value}')  # Print constant name and value
     logging.info(f'{key}: {value}')  # Log constant name and value
 
-def main():
-  clearConsole()  # Clear the console
-  inputPath = input('Enter the directory path: ')  # Get input path from user
+  if settings:
+    print('\nCurrent Settings:')
+    logging.info('Current Settings:')
+    for key, value in settings.items():
+      print(f'{key}: {value}')  # Print the setting actually used for this run
+      logging.info(f'{key}: {value}')  # Log the setting actually used for this run
+
+def positiveInt(value):
+  number = int(value)  # argparse turns the ValueError into a usage error
+  if number < 1:
+    raise argparse.ArgumentTypeError(f'must be at least 1, got {value}')
+  return number
+
+def parseArgs(argv=None):
+  parser = argparse.ArgumentParser(description='Compress images to WebP and videos to WebM.')
+  parser.add_argument('paths', nargs='*', help='Directories to process, prompts for one when omitted')
+  parser.add_argument('--quality', help='WebP quality passed to cwebp')
+  parser.add_argument('--crf', help='Constant Rate Factor passed to ffmpeg')
+  parser.add_argument('--bitrate', help='WebM video bitrate passed to ffmpeg')
+  parser.add_argument('--workers', type=int, help='Number of worker threads')
+  parser.add_argument('--no-backup', action='store_true', help='Leave originals in place instead of moving them to the backup folder')
+  parser.add_argument('--memory-budget-mb', type=int, help='Projected memory allowed for running jobs, 0 disables the budget')
+  parser.add_argument('--duplicates', choices=['report', 'lowerQuality'], help='Detect near-duplicate images per folder and report them or encode all but the best copy at a lower quality')
+  parser.add_argument('--staging-dir', help='Local scratch folder (tmpfs/SSD) to stage inputs from slow or network volumes')
+  parser.add_argument('--staging-max-mb', type=int, help='Maximum megabytes held in the staging folder')
+  parser.add_argument('--read-ahead', type=int, help='Number of inputs copied to the staging folder ahead of the encoders')
+  parser.add_argument('--estimate', action='store_true', help='Encode a stratified sample into a temporary folder and predict run time and savings, originals are not touched')
+  parser.add_argument('--samples', type=positiveInt, default=3, help='Samples per extension and size group for --estimate')
+  parser.add_argument('--seed', type=int, help='Random seed for --estimate sampling')
+  parser.add_argument('--refresh-capabilities', action='store_true', help='Probe cwebp, ffmpeg, ffprobe and exiftool again instead of using the cached results')
+  parser.add_argument('--no-dependency-check', action='store_true', help='Skip the dependency check at startup')
+  return parser.parse_args(argv)
+
+def buildSettings(args):
+  overrides = {}  # Only override the values given on the command line
+  if args.quality is not None:
+    overrides['webpQuality'] = args.quality
+  if args.crf is not None:
+    overrides['crfWebm'] = args.crf
+  if args.bitrate is not None:
+    overrides['webmBitrate'] = args.bitrate
+  if args.workers is not None:
+    overrides['maxWorkers'] = args.workers
+  if args.no_backup:
+    overrides['moveOriginalsToBackup'] = False
+  if args.memory_budget_mb is not None:
+    overrides['memoryBudgetBytes'] = args.memory_budget_mb * 1024 ** 2
+  if args.duplicates is not None:
+    overrides['duplicatePolicy'] = args.duplicates
+  if args.staging_dir is not None:
+    overrides['stagingDir'] = args.staging_dir
+  if args.staging_max_mb is not None:
+    overrides['stagingMaxBytes'] = args.staging_max_mb * 1024 ** 2
+  if args.read_ahead is not None:
+    overrides['stagingReadAhead'] = args.read_ahead
+  return resolveSettings(overrides)
+
+def main(argv=None):
+  args = parseArgs(argv)  # Parse the command line flags
+  configureLogging()  # Send the log to LOG_FILE
+  settings = buildSettings(args)  # Build the per-run settings
+
+  if args.refresh_capabilities:
+    getCapabilities(refresh=True)  # Replace the cached probe results
+
+  if ENABLE_DEPENDENCY_CHECK and not args.no_dependency_check:  # Check if dependency check is enabled
+    checkDependencies()  # Call dependency check
+
+  inputPaths = args.paths
+  if not inputPaths:
+    clearConsole()  # Clear the console
+    inputPaths = [input('Enter the directory path: ')]  # Get input path from user
 
   timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # Add timestamp
   logging.info(f"[{timestamp}] --- Script Execution Started ---")  # Log start time
-  logging.info(f"Input folder: {inputPath}")  # Log input folder
-
-  logConstants()  # Log and print constants at the start of the script
-
-  filesToProcess = []  # List to collect (filePath, outputFolder, movedFolder, unpairedFolder)
-
-  # Walk through all subdirectories, skipping ignored folders
-  for root, dirs, filenames in os.walk(inputPath):
-    folderName = os.path.basename(os.path.normpath(root))  # Get current folder name
-
-    # Define output, backup, and unpaired folders for this subfolder
-    outputFolder = os.path.join(root, f'{folderName}_compressed')
-    movedFolder = os.path.join(root, f'{folderName}_originals_backup')
-    unpairedFolder = os.path.join(root, f'{folderName}_unpaired')
-
-    # Ignore traversing into any of these folders
-    ignoreFolders = {
-      os.path.basename(outputFolder),
-      os.path.basename(movedFolder),
-      os.path.basename(unpairedFolder)
-    }
-    dirs[:] = [d for d in dirs if d not in ignoreFolders]
+  logging.info(f"Input folder: {', '.join(inputPaths)}")  # Log input folder
 
-    filesInThisFolder = []  # Collect files for this folder
+  logConstants(settings)  # Log and print constants at the start of the script
 
-    for file in filenames:
-      filePath = os.path.join(root, file)
-      # Skip files inside any of the special folders
-      if any(filePath.startswith(os.path.join(root, f'{folderName}_{suffix}')) for suffix in ['compressed', 'originals_backup', 'unpaired']):
-        continue
-      filesInThisFolder.append((filePath, outputFolder, movedFolder, unpairedFolder))
+  if args.estimate:
+    estimate = estimateTree(inputPaths, settings, args.samples, args.workers, args.seed)  # Sample run into a temporary folder
+    report = formatEstimate(estimate)
+    print(f'\nEstimate:\n{report}')
+    logging.info(f'Estimate:\n{report}')
+    return
 
-    if filesInThisFolder:  # Only create folders if there are files to process
-      os.makedirs(outputFolder, exist_ok=True)
-      os.makedirs(movedFolder, exist_ok=True)
-      os.makedirs(unpairedFolder, exist_ok=True)
-      filesToProcess.extend(filesInThisFolder)
+  filesToProcess = collectFiles(inputPaths)  # List of (filePath, outputFolder, movedFolder, unpairedFolder)
 
   totalFiles = len(filesToProcess)  # Count total files
   logging.info(f"Total files to process: {totalFiles}")  # Log total file count
 
-
-  from concurrent.futures import as_completed
+  from tqdm import tqdm  # Imported lazily, only the progress bar needs it
   progressBar = tqdm(total=totalFiles, desc='Processing Files', ncols=80)
-  futures = []
-  results = []
-
-  with ThreadPoolExecutor() as executor:
-    for filePath, outputFolder, movedFolder, unpairedFolder in filesToProcess:
-      ext = filePath.lower()
-      if ext.endswith(('.jpg', '.jpeg', '.png', '.webp')) and USE_THREAD_POOL_FOR_IMAGES:
-        futures.append(executor.submit(processImage, Path(filePath), outputFolder, movedFolder))
-      elif ext.endswith(('.mp4', '.mov', '.avi', '.webm', '.m4v')) and USE_THREAD_POOL_FOR_VIDEOS:
-        futures.append(executor.submit(processVideo, Path(filePath), outputFolder, movedFolder))
-      else:
-        # Process in main thread if not using thread pool
-        if ext.endswith(('.jpg', '.jpeg', '.png', '.webp')):
-          result = processImage(Path(filePath), outputFolder, movedFolder)
-        elif ext.endswith(('.mp4', '.mov', '.avi', '.webm', '.m4v')):
-          result = processVideo(Path(filePath), outputFolder, movedFolder)
-        else:
-          result = None
-        if result:
-          results.append(result)
-        progressBar.update(1)
-
-    for future in as_completed(futures):
-      result = future.result()
-      if result:
-        results.append(result)
-      progressBar.update(1)
-
-  progressBar.close()
 
   # Centralized logging/output for all results (use tqdm.write to keep progress bar at bottom)
-  for result in results:
+  for result in compressTree(inputPaths, settings, filesToProcess):
     for msg in result.get('messages', []):
       if result['status'] == 'error':
         tqdm.write(f'[ERROR] {msg}')
@@ -134,11 +142,9 @@ def main():
       else:
         tqdm.write(msg)
         logging.info(msg)
+    progressBar.update(1)
 
-  # Move unpaired files for each unique subfolder after processing
-  uniqueFolders = set((outputFolder, movedFolder, unpairedFolder) for _, outputFolder, movedFolder, unpairedFolder in filesToProcess)  # Deduplicate folder triplets
-  for outputFolder, movedFolder, unpairedFolder in uniqueFolders:
-    moveUnpairedFiles(outputFolder, movedFolder, unpairedFolder)  # Move unpaired files for this subfolder
+  progressBar.close()
 
   logging.info('Processing complete.')
 
@@ -146,6 +152,4 @@ def main():
   logging.info(f'[{timestamp}] --- Script Execution Ended ---')
 
 if __name__ == '__main__':
-  if ENABLE_DEPENDENCY_CHECK:  # Check if dependency check is enabled
-    checkDependencies()  # Call dependency check
   main()
@@ -0,0 +1,127 @@
+import os
+import json
+import shutil
+import subprocess
+import threading
+import logging  # Import logging module
+
+from config import CAPABILITY_CACHE_FILE, CREATE_NO_WINDOW
+
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
+
+TOOLS = ('cwebp', 'ffmpeg', 'ffprobe', 'exiftool')  # External executables used by the pipeline
+VIDEO_CODECS = ('libvpx', 'libvpx-vp9')  # WebM video encoders in order of preference when the configured one is missing
+AUDIO_CODECS = ('libvorbis', 'libopus')  # WebM audio encoders in order of preference when the configured one is missing
+
+capabilitiesLock = threading.Lock()  # Guards the in-process cache
+cachedCapabilities = None  # Capabilities probed by this process
+
+def runTool(args):
+  try:
+    result = subprocess.run(
+      args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors='replace', timeout=30, creationflags=CREATE_NO_WINDOW
+    )  # Some tools print their version or help to stderr
+    return result.stdout
+  except Exception as e:
+    logger.error(f"Error probing {args[0]}: {e}")
+    return ''
+
+def getFirstLine(text):
+  lines = text.strip().splitlines()
+  return lines[0].strip() if lines else ''
+
+def parseFfmpegEncoders(text):
+  encoders = []  # Encoder names compiled into ffmpeg
+  for line in text.splitlines():
+    parts = line.split()
+    # Encoder lines look like ' V....D libvpx  libvpx VP8 (codec vp8)'
+    if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] in 'VAS' and parts[1] != '=':  # Skip the legend lines
+      encoders.append(parts[1])
+  return encoders
+
+def probeTool(name, path):
+  if name == 'ffmpeg':
+    return {
+      'version': getFirstLine(runTool([path, '-version'])),
+      'encoders': sorted(parseFfmpegEncoders(runTool([path, '-hide_banner', '-encoders'])))  # Every encoder compiled in
+    }
+  if name == 'ffprobe':
+    return {'version': getFirstLine(runTool([path, '-version']))}
+  if name == 'cwebp':
+    return {
+      'version': getFirstLine(runTool([path, '-version'])),
+      'threads': '-mt' in runTool([path, '-longhelp'])  # Multithreaded encoding support
+    }
+  if name == 'exiftool':
+    return {'version': getFirstLine(runTool([path, '-ver']))}
+  return {}
+
+def loadCache():
+  try:
+    with open(CAPABILITY_CACHE_FILE, 'r', encoding='utf-8') as f:
+      return json.load(f)
+  except (OSError, ValueError):
+    return {}  # Missing or unreadable cache, probe again
+
+def saveCache(cache):
+  try:
+    os.makedirs(os.path.dirname(CAPABILITY_CACHE_FILE) or '.', exist_ok=True)
+    tempFile = f'{CAPABILITY_CACHE_FILE}.{os.getpid()}.tmp'
+    with open(tempFile, 'w', encoding='utf-8') as f:
+      json.dump(cache, f, indent=2)
+    os.replace(tempFile, CAPABILITY_CACHE_FILE)  # Atomic swap so concurrent runs never read half a file
+  except OSError as e:
+    logger.error(f"Error writing capability cache {CAPABILITY_CACHE_FILE}: {e}")
+
+def getCapabilities(refresh=False):
+  global cachedCapabilities
+  with capabilitiesLock:
+    if cachedCapabilities is not None and not refresh:
+      return cachedCapabilities
+
+    cache = {} if refresh else loadCache()
+    capabilities = {}  # Tool name -> probe result, None when the tool is not installed
+    changed = False
+    for name in TOOLS:
+      path = shutil.which(name)
+      if not path:
+        capabilities[name] = None
+        continue
+      path = os.path.realpath(path)  # Follow symlinks so upgrades change the key
+      mtime = os.path.getmtime(path)
+      entry = cache.get(name)
+      if not entry or entry.get('path') != path or entry.get('mtime') != mtime:
+        entry = {'path': path, 'mtime': mtime, 'info': probeTool(name, path)}  # Binary changed, probe again
+        cache[name] = entry
+        changed = True
+        logger.info(f"Probed {name}: {entry['info'].get('version', '')}")
+      capabilities[name] = dict(entry['info'], path=path)
+
+    if changed:
+      saveCache(cache)
+    cachedCapabilities = capabilities
+    return capabilities
+
+def getMissingTools(capabilities):
+  return {name for name, info in capabilities.items() if info is None}
+
+def chooseEncoders(settings, capabilities):
+  chosen = dict(settings)
+  cwebp = capabilities.get('cwebp')
+  if settings['cwebpMultithread'] is None:
+    chosen['cwebpMultithread'] = bool(cwebp and cwebp.get('threads'))  # Use -mt when this cwebp build supports it
+
+  ffmpeg = capabilities.get('ffmpeg')
+  if not ffmpeg or not ffmpeg.get('encoders'):
+    return chosen  # Nothing known about ffmpeg, keep the configured encoders
+  available = set(ffmpeg['encoders'])
+  for key, fallbacks in (('videoCodec', VIDEO_CODECS), ('audioCodec', AUDIO_CODECS)):
+    if settings[key] in available:
+      continue
+    replacement = next((codec for codec in fallbacks if codec in available), None)
+    if replacement:
+      logger.warning(f"ffmpeg has no {settings[key]} encoder, using {replacement}")
+      chosen[key] = replacement
+    else:
+      logger.error(f"ffmpeg has none of the {key} encoders: {', '.join(fallbacks)}")
+  return chosen
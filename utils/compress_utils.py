@@ -0,0 +1,213 @@
+import os
+import logging  # Import logging module
+from functools import partial
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+
+from utils.image_utils import processImage
+from utils.video_utils import processVideo
+from utils.file_utils import moveUnpairedFiles
+from utils.settings_utils import resolveSettings
+from utils.staging_utils import StagingArea
+from utils.capability_utils import getCapabilities, getMissingTools, chooseEncoders
+from utils.memory_utils import MemoryBudget, getMemoryBudget, estimateFootprint
+from utils.duplicate_utils import analyzeDuplicates
+
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')  # Extensions handled by processImage
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.webm', '.m4v')  # Extensions handled by processVideo
+FOLDER_SUFFIXES = ('compressed', 'originals_backup', 'unpaired')  # Suffixes of the folders created next to the inputs
+IMAGE_TOOLS = ('cwebp',)  # Executables processImage cannot run without
+VIDEO_TOOLS = ('ffmpeg', 'ffprobe')  # Executables processVideo cannot run without
+
+def getFolders(root):
+  folderName = os.path.basename(os.path.normpath(root))  # Get current folder name
+  return (
+    os.path.join(root, f'{folderName}_compressed'),  # Output folder
+    os.path.join(root, f'{folderName}_originals_backup'),  # Backup folder
+    os.path.join(root, f'{folderName}_unpaired')  # Unpaired folder
+  )
+
+def collectFiles(roots, createFolders=True):
+  if isinstance(roots, (str, os.PathLike)):
+    roots = [roots]  # Accept a single root as well as a list of roots
+
+  filesToProcess = []  # List to collect (filePath, outputFolder, movedFolder, unpairedFolder)
+
+  for inputPath in roots:
+    # Walk through all subdirectories, skipping ignored folders
+    for root, dirs, filenames in os.walk(inputPath):
+      outputFolder, movedFolder, unpairedFolder = getFolders(root)  # Define output, backup, and unpaired folders for this subfolder
+      folderName = os.path.basename(os.path.normpath(root))  # Get current folder name
+
+      # Ignore traversing into any of these folders
+      ignoreFolders = {
+        os.path.basename(outputFolder),
+        os.path.basename(movedFolder),
+        os.path.basename(unpairedFolder)
+      }
+      dirs[:] = [d for d in dirs if d not in ignoreFolders]
+
+      filesInThisFolder = []  # Collect files for this folder
+
+      for file in filenames:
+        filePath = os.path.join(root, file)
+        # Skip files inside any of the special folders
+        if any(filePath.startswith(os.path.join(root, f'{folderName}_{suffix}')) for suffix in FOLDER_SUFFIXES):
+          continue
+        filesInThisFolder.append((filePath, outputFolder, movedFolder, unpairedFolder))
+
+      if filesInThisFolder:  # Only create folders if there are files to process
+        if createFolders:
+          os.makedirs(outputFolder, exist_ok=True)
+          os.makedirs(movedFolder, exist_ok=True)
+          os.makedirs(unpairedFolder, exist_ok=True)
+        filesToProcess.extend(filesInThisFolder)
+
+  return filesToProcess
+
+def compressFile(filePath, outputFolder=None, movedFolder=None, settings=None):
+  settings = resolveSettings(settings)  # Merge per-call overrides with the defaults
+  filePath = Path(filePath)  # Normalize the input path
+  if outputFolder is None or movedFolder is None:
+    defaultOutput, defaultMoved, _ = getFolders(str(filePath.parent))  # Use the same folders as compressTree
+    outputFolder = outputFolder or defaultOutput
+    movedFolder = movedFolder or defaultMoved
+  os.makedirs(outputFolder, exist_ok=True)  # Ensure the output folder exists
+
+  settings, missingTools = prepareRun(settings)  # Pick encoders from the probed capabilities
+  return processJob(filePath, outputFolder, movedFolder, settings, missingTools)
+
+def prepareRun(settings):
+  if not settings['probeCapabilities']:
+    return settings, set()  # Trust the configuration, failures surface file by file
+  capabilities = getCapabilities()  # Cached probe, only re-runs when a binary changes
+  missingTools = getMissingTools(capabilities)
+  if missingTools:
+    logger.error(f"Missing tools, affected files will be skipped: {', '.join(sorted(missingTools))}")
+  return chooseEncoders(settings, capabilities), missingTools
+
+def processJob(filePath, outputFolder, movedFolder, settings, missingTools=()):
+  ext = str(filePath).lower()
+  if ext.endswith(IMAGE_EXTENSIONS) or ext.endswith(VIDEO_EXTENSIONS):
+    required = IMAGE_TOOLS if ext.endswith(IMAGE_EXTENSIONS) else VIDEO_TOOLS
+    unavailable = [tool for tool in required if tool in missingTools]
+    if unavailable:
+      return {'status': 'error', 'messages': [f"Skipped {filePath}: {', '.join(unavailable)} not installed"], 'file': str(filePath), 'output': None}
+  if ext.endswith(IMAGE_EXTENSIONS):
+    return processImage(Path(filePath), outputFolder, movedFolder, settings, 'exiftool' not in missingTools)  # Without exiftool only the PNG metadata step is skipped
+  if ext.endswith(VIDEO_EXTENSIONS):
+    return processVideo(Path(filePath), outputFolder, movedFolder, settings)
+  return {'status': 'skipped', 'messages': [], 'file': str(filePath), 'output': None}  # Report unsupported files so callers can count them
+
+def isPooled(filePath, settings):
+  ext = filePath.lower()
+  return (ext.endswith(IMAGE_EXTENSIONS) and settings['useThreadPoolForImages']) or (ext.endswith(VIDEO_EXTENSIONS) and settings['useThreadPoolForVideos'])
+
+def isSupported(filePath):
+  return filePath.lower().endswith(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS)
+
+def compressTree(roots, settings=None, filesToProcess=None):
+  settings = resolveSettings(settings)  # Merge per-call overrides with the defaults
+  if filesToProcess is None:
+    filesToProcess = collectFiles(roots)  # Walk the roots with the folder rules
+  settings, missingTools = prepareRun(settings)  # Pick encoders from the probed capabilities
+  runJob = partial(processJob, missingTools=missingTools)
+
+  duplicateOf = analyzeDuplicates(filesToProcess, settings, IMAGE_EXTENSIONS) if settings['duplicatePolicy'] else {}  # Near-duplicate path -> kept copy
+  duplicateQuality = str(min(int(settings['webpQuality']), int(settings['duplicateWebpQuality'])))  # Never above the quality of the kept copy
+  duplicateSettings = dict(settings, webpQuality=duplicateQuality)  # Settings for near-duplicates under 'lowerQuality'
+
+  def annotate(result):
+    best = duplicateOf.get(result['file'])
+    if best:
+      result['duplicateOf'] = best  # Let callers act on the cluster as well
+      if settings['duplicatePolicy'] == 'lowerQuality':
+        result['messages'].append(f"Near-duplicate of {best}, encoded at quality {duplicateQuality}: {result['file']}")
+      else:
+        result['messages'].append(f"Near-duplicate of {best}: {result['file']}")
+    return result
+
+  budgetBytes = getMemoryBudget(settings)
+  memoryBudget = MemoryBudget(budgetBytes) if budgetBytes else None  # Admit jobs only while their projected memory fits
+
+  staging = None
+  jobs = ((job, None) for job in filesToProcess)  # Jobs processed in place
+  if settings['stagingDir']:
+    staging = StagingArea(settings['stagingDir'], settings['stagingMaxBytes'], settings['stagingReadAhead'])
+    jobs = staging.prefetch(filesToProcess, isSupported)  # Jobs copied to the local scratch folder ahead of time
+
+  def isFinished(future):
+    if not future.done():
+      return False
+    if future.exception() is not None:
+      return True
+    inner = future.result()
+    return not isinstance(inner, Future) or inner.done()  # Staged jobs also wait for their write-back
+
+  def unwrap(future):
+    result = future.result()
+    return annotate(result.result() if isinstance(result, Future) else result)
+
+  executor = ThreadPoolExecutor(max_workers=settings['maxWorkers'])
+  futures = []
+  completed = False  # Stays False when the caller closes the generator early or a job raises
+
+  def takeFinished():
+    finished = [future for future in futures if isFinished(future)]
+    for future in finished:
+      futures.remove(future)  # Only the final as_completed pass waits for the rest
+    return finished
+
+  try:
+    for job, staged in jobs:
+      for future in takeFinished():
+        yield unwrap(future)  # Yield pooled results that finished while waiting for this job
+
+      filePath, outputFolder, movedFolder, _ = job
+      jobSettings = duplicateSettings if filePath in duplicateOf and settings['duplicatePolicy'] == 'lowerQuality' else settings
+      if staged:
+        task = (staging.run, runJob, job, staged, jobSettings)  # Encode locally, write back on the staging writer
+      else:
+        task = (runJob, filePath, outputFolder, movedFolder, jobSettings)
+      if memoryBudget and isSupported(filePath):
+        lowerPath = filePath.lower()
+        headerPath = staged[0] if staged else filePath  # Read the header from the local copy when the job was staged
+        cost = estimateFootprint(headerPath, settings, lowerPath.endswith(IMAGE_EXTENSIONS), lowerPath.endswith(VIDEO_EXTENSIONS))  # Read from the header only
+        if isPooled(filePath, settings):
+          futures.append(memoryBudget.submit(executor, cost, *task))
+        else:
+          result = memoryBudget.run(cost, *task)  # Wait for room next to the pooled jobs
+          yield annotate(result.result() if staged else result)
+          for future in takeFinished():
+            yield unwrap(future)  # Pooled results that finished during the inline job
+      elif isPooled(filePath, settings):
+        futures.append(executor.submit(*task))
+      else:
+        # Process in the calling thread if not using thread pool, pooled jobs keep running meanwhile
+        result = task[0](*task[1:])
+        yield annotate(result.result() if staged else result)
+        for future in takeFinished():
+          yield unwrap(future)  # Pooled results that finished during the inline job
+
+    for future in as_completed(futures):
+      yield unwrap(future)  # Yield each remaining result as soon as it finishes
+    completed = True
+  finally:
+    if not completed:
+      # Abandoned run: drop everything that has not started so no more originals are touched
+      if memoryBudget:
+        memoryBudget.cancel()  # Jobs still waiting for memory are never admitted
+      if staging:
+        staging.stop()  # Stop copying before the scratch folder is removed
+    executor.shutdown(wait=True, cancel_futures=not completed)  # Running jobs finish, queued ones are cancelled
+    if staging:
+      staging.close()  # Flush pending write-backs and remove the scratch folder
+
+  if settings['moveUnpairedFiles']:
+    # Move unpaired files for each unique subfolder after processing
+    uniqueFolders = set((outputFolder, movedFolder, unpairedFolder) for _, outputFolder, movedFolder, unpairedFolder in filesToProcess)  # Deduplicate folder triplets
+    for outputFolder, movedFolder, unpairedFolder in uniqueFolders:
+      moveUnpairedFiles(outputFolder, movedFolder, unpairedFolder)  # Move unpaired files for this subfolder
+    logger.info('Unpaired files moved for all folders')
@@ -2,9 +2,11 @@ import os
 import sys
 import logging  # Import logging module
 
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
+
 def clearConsole():
   if sys.platform.startswith('win'):
     os.system('cls')
   else:
     os.system('clear')
-  logging.info('Console cleared')  # Log the console clear action
+  logger.info('Console cleared')  # Log the console clear action
@@ -1,7 +1,9 @@
-import importlib  # Import the importlib module
+import importlib.util  # Import importlib.util to find modules without importing them
 import sys  # Import the sys module
 import logging  # Import logging module
-import shutil  # Import shutil to check for executables
+from utils.capability_utils import getCapabilities  # Import the cached tool probe
+
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
 
 def checkDependencies():
   dependencies = {
@@ -9,23 +11,20 @@ def checkDependencies():
     'tqdm': 'pip install tqdm',  # Python module
     'Pillow': 'pip install Pillow',  # Python module
     'ffmpeg': 'Refer to https://ffmpeg.org/download.html for installation',  # External executable
+    'ffprobe': 'Installed together with ffmpeg, refer to https://ffmpeg.org/download.html',  # External executable
+    'cwebp': 'Refer to https://developers.google.com/speed/webp/download for installation',  # External executable
     'exiftool': 'Refer to https://exiftool.org/ for installation'  # External executable
   }  # Define required dependencies and their installation instructions
 
+  capabilities = getCapabilities()  # Cached probe of the external executables
   missing = []
   for module, installCmd in dependencies.items():
-    if module in ['ffmpeg', 'exiftool']:  # Check for external executables
-      if not shutil.which(module):  # Verify if the executable is in PATH
+    if module in capabilities:  # Check for external executables
+      if capabilities[module] is None:  # Verify if the executable is in PATH
         missing.append((module, installCmd))  # Add missing executable and installation command
-    elif module == 'Pillow':  # Special case for Pillow
-      try:
-        importlib.import_module('PIL')  # Try importing the PIL module
-      except ImportError:
-        missing.append((module, installCmd))  # Add missing module and installation command
     else:
-      try:
-        importlib.import_module(module)  # Try importing the Python module
-      except ImportError:
+      moduleName = 'PIL' if module == 'Pillow' else module  # Pillow is imported as PIL
+      if importlib.util.find_spec(moduleName) is None:  # Look the module up without importing it
         missing.append((module, installCmd))  # Add missing module and installation command
 
   if missing:
@@ -35,4 +34,4 @@ def checkDependencies():
     print('\nPlease install the missing dependencies and restart the script.')
     sys.exit(1)  # Exit the script if dependencies are missing
   else:
-    logging.info('Dependencies checked successfully')  # Log dependency check success
\ No newline at end of file
+    logger.info('Dependencies checked successfully')  # Log dependency check success
\ No newline at end of file
@@ -0,0 +1,143 @@
+import os
+import logging  # Import logging module
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
+
+HASH_BITS = 64  # Both hashes are 8x8 bits
+PHASH_SIZE = 32  # Thumbnail edge used for the pHash DCT
+DHASH_SIZE = (9, 8)  # Thumbnail size used for the dHash row gradients
+PAIR_CHUNK = 1 << 18  # Candidate pairs compared per vectorized step
+
+def loadThumbnail(filePath, hashType):
+  from PIL import Image  # Imported lazily, only the analysis stage needs Pillow here
+  try:
+    with Image.open(filePath) as im:
+      size = im.size  # Original resolution, used to pick the best copy
+      thumbSize = DHASH_SIZE if hashType == 'dhash' else (PHASH_SIZE, PHASH_SIZE)
+      im.draft('L', (thumbSize[0] * 4, thumbSize[1] * 4))  # Let the JPEG decoder downscale while decoding
+      thumb = im.convert('L').resize(thumbSize, Image.BILINEAR)
+      return size, thumb.tobytes()
+  except Exception as e:
+    logger.error(f"Error reading {filePath} for duplicate detection: {e}")
+    return None
+
+def computeHashes(np, thumbnails, hashType):
+  if hashType == 'dhash':
+    pixels = np.frombuffer(b''.join(thumbnails), dtype=np.uint8).reshape(-1, DHASH_SIZE[1], DHASH_SIZE[0]).astype(np.int16)
+    bits = pixels[:, :, 1:] > pixels[:, :, :-1]  # Horizontal gradient sign for the whole batch
+  else:
+    pixels = np.frombuffer(b''.join(thumbnails), dtype=np.uint8).reshape(-1, PHASH_SIZE, PHASH_SIZE).astype(np.float32)
+    index = np.arange(PHASH_SIZE)
+    dct = np.cos(np.pi * (2 * index[None, :] + 1) * index[:, None] / (2 * PHASH_SIZE)).astype(np.float32)  # DCT-II basis
+    coefficients = np.einsum('ij,bjk,lk->bil', dct, pixels, dct)[:, :8, :8]  # 2D DCT of the batch, keep the low frequencies
+    flat = coefficients.reshape(len(thumbnails), -1)
+    median = np.median(flat[:, 1:], axis=1, keepdims=True)  # Ignore the DC term like the reference pHash
+    bits = flat > median
+  return np.packbits(bits.reshape(len(thumbnails), HASH_BITS), axis=1).view('>u8').ravel().astype(np.uint64)
+
+def hashImages(filePaths, hashType, maxWorkers=None, batchSize=256):
+  import numpy as np  # Imported lazily, optional dependency for this stage
+
+  hashes = []
+  sizes = []
+  paths = []
+  with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+    for start in range(0, len(filePaths), batchSize):
+      batch = filePaths[start:start + batchSize]
+      loaded = [(path, item) for path, item in zip(batch, executor.map(loadThumbnail, batch, [hashType] * len(batch))) if item]  # Decode thumbnails in parallel
+      if not loaded:
+        continue
+      hashes.append(computeHashes(np, [thumb for _, (_, thumb) in loaded], hashType))  # One vectorized pass per batch
+      sizes.extend(size for _, (size, _) in loaded)
+      paths.extend(path for path, _ in loaded)
+  return paths, sizes, np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.uint64)
+
+def countBits(np, values):
+  # SWAR popcount of every uint64 at once, avoids expanding the candidates to bytes
+  values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+  values = (values & np.uint64(0x3333333333333333)) + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+  values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+  return (values * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+def findRoots(np, parent, indexes):
+  roots = parent[indexes]
+  while True:
+    nextRoots = parent[roots]  # Pointer jumping, one step for every index at once
+    if (nextRoots == roots).all():
+      break
+    roots = nextRoots
+  parent[indexes] = roots  # Path compression for the next lookup
+  return roots
+
+def clusterHashes(np, hashes, maxDistance):
+  uniqueHashes, inverse = np.unique(hashes, return_inverse=True)  # Identical hashes are compared once
+  parent = np.arange(len(uniqueHashes))  # Union-find over the distinct hashes
+
+  def find(i):
+    while parent[i] != i:
+      parent[i] = parent[parent[i]]
+      i = parent[i]
+    return i
+
+  # Pigeonhole index: two hashes within maxDistance bits agree exactly on at least one of maxDistance + 1 blocks
+  blockCount = maxDistance + 1
+  bounds = np.linspace(0, HASH_BITS, blockCount + 1).astype(int)
+  for low, high in zip(bounds[:-1], bounds[1:]):
+    mask = np.uint64(((1 << int(high - low)) - 1) << int(low))
+    keys = uniqueHashes & mask
+    order = np.argsort(keys, kind='stable')
+    splits = np.flatnonzero(np.diff(keys[order])) + 1
+    for group in np.split(order, splits):
+      if len(group) < 2:
+        continue  # Nothing shares this block value
+      rowsPerChunk = max(1, PAIR_CHUNK // len(group))  # Bound the candidate matrix, large groups are compared a slice at a time
+      for start in range(0, len(group) - 1, rowsPerChunk):
+        groupRoots = findRoots(np, parent, group)
+        if (groupRoots == groupRoots[0]).all():
+          break  # The whole group is already one cluster
+        rows, columns = group[start:start + rowsPerChunk], group[start + 1:]
+        distance = countBits(np, uniqueHashes[rows][:, None] ^ uniqueHashes[columns][None, :])  # Vectorized Hamming distance of the candidates
+        upper = np.arange(len(columns))[None, :] >= np.arange(len(rows))[:, None]  # Each pair once, row before column
+        rowIndex, columnIndex = np.nonzero((distance <= maxDistance) & upper)
+        rowRoots, columnRoots = groupRoots[start + rowIndex], groupRoots[start + 1 + columnIndex]
+        different = rowRoots != columnRoots  # Skip matches already in the same cluster
+        for a, b in set(zip(rowRoots[different].tolist(), columnRoots[different].tolist())):
+          parent[find(a)] = find(b)
+
+  labels = findRoots(np, parent, np.arange(len(uniqueHashes)))[inverse]  # Cluster of every image
+  clusters = {}
+  for i, label in enumerate(labels.tolist()):
+    clusters.setdefault(label, []).append(i)
+  return [members for members in clusters.values() if len(members) > 1]
+
+def findDuplicates(filePaths, hashType='phash', maxDistance=6, maxWorkers=None, batchSize=256):
+  try:
+    import numpy as np  # Imported lazily, optional dependency for this stage
+  except ImportError:
+    logger.error('Duplicate detection needs numpy: pip install numpy')
+    return []
+
+  paths, sizes, hashes = hashImages(list(filePaths), hashType, maxWorkers, batchSize)
+  clusters = []
+  for members in clusterHashes(np, hashes, maxDistance):
+    # Keep the highest resolution, then the largest (least compressed) file
+    ranked = sorted(members, key=lambda i: (sizes[i][0] * sizes[i][1], os.path.getsize(paths[i]), paths[i]), reverse=True)
+    clusters.append({'best': paths[ranked[0]], 'duplicates': [paths[i] for i in ranked[1:]]})
+  return clusters
+
+def analyzeDuplicates(filesToProcess, settings, imageExtensions):
+  folders = {}  # Output folder -> image paths, analysis is done per folder
+  for filePath, outputFolder, _, _ in filesToProcess:
+    if filePath.lower().endswith(imageExtensions):
+      folders.setdefault(outputFolder, []).append(filePath)
+
+  duplicateOf = {}  # Duplicate path -> path of the copy kept at full quality
+  for outputFolder, filePaths in folders.items():
+    if len(filePaths) < 2:
+      continue
+    for cluster in findDuplicates(filePaths, settings['duplicateHash'], settings['duplicateMaxDistance'], settings['maxWorkers'], settings['duplicateBatchSize']):
+      logger.info(f"Near-duplicates of {cluster['best']}: {', '.join(cluster['duplicates'])}")
+      for path in cluster['duplicates']:
+        duplicateOf[path] = cluster['best']
+  return duplicateOf
@@ -0,0 +1,144 @@
+import os
+import math
+import time
+import random
+import tempfile
+import logging  # Import logging module
+from pathlib import Path
+
+from utils.compress_utils import collectFiles, processJob, isSupported, isPooled, prepareRun
+from utils.settings_utils import resolveSettings
+
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
+
+SIZE_BUCKETS = (256 * 1024, 1024 ** 2, 8 * 1024 ** 2, 64 * 1024 ** 2, 512 * 1024 ** 2)  # Upper bounds of the size buckets in bytes
+Z_95 = 1.96  # z value for a 95% confidence interval
+
+def getSizeBucket(size):
+  for index, upperBound in enumerate(SIZE_BUCKETS):
+    if size < upperBound:
+      return index  # First bucket the file fits in
+  return len(SIZE_BUCKETS)  # Everything larger than the last bound
+
+def buildStrata(filesToProcess):
+  strata = {}  # (extension, size bucket) -> list of (filePath, size)
+  for filePath, _, _, _ in filesToProcess:
+    if not isSupported(filePath):
+      continue  # Only files the encoders would touch count towards the estimate
+    try:
+      size = os.path.getsize(filePath)
+    except OSError as e:
+      logger.error(f"Error reading size of {filePath}: {e}")
+      continue
+    key = (os.path.splitext(filePath)[1].lower(), getSizeBucket(size))
+    strata.setdefault(key, []).append((filePath, size))
+  return strata
+
+def getChildCpuSeconds():
+  times = os.times()  # Children times are only filled in on Unix
+  return times.children_user + times.children_system
+
+def measureSample(filePath, scratchFolder, index, settings, missingTools):
+  outputFolder = os.path.join(scratchFolder, str(index))  # One folder per sample avoids name clashes
+  os.makedirs(outputFolder, exist_ok=True)  # cwebp and ffmpeg do not create the output folder
+  cpuBefore = getChildCpuSeconds()
+  wallBefore = time.perf_counter()
+  result = processJob(Path(filePath), outputFolder, os.path.join(outputFolder, 'moved'), settings, missingTools)
+  wallSeconds = time.perf_counter() - wallBefore
+  cpuSeconds = getChildCpuSeconds() - cpuBefore
+  if cpuSeconds <= 0:
+    cpuSeconds = wallSeconds  # No child accounting on this platform, fall back to wall time
+
+  output = result.get('output')
+  if result['status'] == 'error' or not output or not os.path.exists(output):
+    return None  # Failed samples are reported but not extrapolated
+  savedBytes = max(0, os.path.getsize(filePath) - os.path.getsize(output))  # Larger outputs are replaced by the original
+  os.remove(output)  # Keep the scratch folder small
+  return {'cpuSeconds': cpuSeconds, 'wallSeconds': wallSeconds, 'savedBytes': savedBytes}
+
+def estimateTotal(strata, measurements, metric, getWeight=lambda key: 1):
+  total = 0.0
+  variance = 0.0
+  for key, files in strata.items():
+    values = [m[metric] for m in measurements.get(key, [])]
+    if not values:
+      continue
+    count = len(files)  # Files in this stratum
+    sampled = len(values)  # Successful samples in this stratum
+    weight = getWeight(key)  # Scales this stratum's contribution, e.g. spread over the workers
+    mean = sum(values) / sampled * weight
+    if sampled > 1:
+      spread = sum((v * weight - mean) ** 2 for v in values) / (sampled - 1)  # Sample variance
+    else:
+      spread = mean ** 2  # A single sample says nothing about spread, assume 100% variation
+    total += count * mean  # Stratified estimator of the total
+    variance += count ** 2 * (1 - sampled / count) * spread / sampled  # With finite population correction
+  margin = Z_95 * math.sqrt(variance)
+  return {'estimate': total, 'low': max(0.0, total - margin), 'high': total + margin}
+
+def estimateTree(roots, settings=None, samplesPerStratum=3, workers=None, seed=None):
+  if samplesPerStratum < 1:
+    raise ValueError(f'samplesPerStratum must be at least 1, got {samplesPerStratum}')
+  settings = resolveSettings(settings)  # Merge per-call overrides with the defaults
+  sampleSettings, missingTools = prepareRun(dict(settings, moveOriginalsToBackup=False))  # Never move the originals while sampling
+  workers = workers or settings['maxWorkers'] or os.cpu_count() or 1  # Worker count used for the wall time estimate
+  rng = random.Random(seed)  # Seeded sampling makes estimates reproducible
+
+  filesToProcess = collectFiles(roots, createFolders=False)  # Same folder rules as compressTree without creating folders
+  strata = buildStrata(filesToProcess)
+  logger.info(f"Estimating from {len(strata)} strata over {sum(len(files) for files in strata.values())} files")
+
+  measurements = {}  # (extension, size bucket) -> list of sample measurements
+  failedSamples = 0
+  index = 0
+  with tempfile.TemporaryDirectory(prefix='estimate_') as scratchFolder:
+    for key, files in sorted(strata.items()):
+      for filePath, _ in rng.sample(files, min(samplesPerStratum, len(files))):
+        index += 1
+        measurement = measureSample(filePath, scratchFolder, index, sampleSettings, missingTools)  # Run samples one at a time so CPU accounting is not shared
+        if measurement is None:
+          failedSamples += 1
+          logger.error(f"Sample failed during estimate: {filePath}")
+          continue
+        measurements.setdefault(key, []).append(measurement)
+
+  cpuSeconds = estimateTotal(strata, measurements, 'cpuSeconds')
+  # Pooled jobs share the workers, the others run one at a time on the calling thread like in compressTree
+  wallSeconds = estimateTotal(strata, measurements, 'wallSeconds', lambda key: 1 / workers if isPooled(strata[key][0][0], settings) else 1)
+  savedBytes = estimateTotal(strata, measurements, 'savedBytes')
+  unsampled = [files for key, files in strata.items() if key not in measurements]  # Groups whose samples all failed
+
+  return {
+    'totalFiles': sum(len(files) for files in strata.values()),  # Supported files found
+    'totalBytes': sum(size for files in strata.values() for _, size in files),  # Bytes those files hold
+    'strata': len(strata),  # Number of (extension, size bucket) groups
+    'sampledFiles': index,  # Samples attempted
+    'failedSamples': failedSamples,  # Samples that failed to encode
+    'unsampledStrata': len(unsampled),  # Groups left out of the totals
+    'unsampledFiles': sum(len(files) for files in unsampled),  # Files in those groups
+    'unsampledBytes': sum(size for files in unsampled for _, size in files),  # Bytes in those groups
+    'complete': not unsampled,  # False when the totals below only cover the sampled groups and are lower bounds
+    'workers': workers,
+    'cpuHours': {k: v / 3600 for k, v in cpuSeconds.items()},  # Encoder CPU time
+    'wallHours': {k: v / 3600 for k, v in wallSeconds.items()},  # Pooled time spread over the workers plus serial time
+    'savedBytes': savedBytes  # Expected bytes saved
+  }
+
+def formatEstimate(estimate):
+  def formatRange(values, unit, scale=1):
+    if not estimate['complete']:
+      # Unsampled groups are missing from the total, so only the lower end means anything
+      return f"at least {values['low'] / scale:.2f} {unit} (sampled groups only: {values['estimate'] / scale:.2f}, 95% CI {values['low'] / scale:.2f} - {values['high'] / scale:.2f})"
+    return f"{values['estimate'] / scale:.2f} {unit} (95% CI {values['low'] / scale:.2f} - {values['high'] / scale:.2f})"
+
+  gib = 1024 ** 3
+  lines = [
+    f"Files: {estimate['totalFiles']} ({estimate['totalBytes'] / gib:.2f} GiB) in {estimate['strata']} groups",
+    f"Samples: {estimate['sampledFiles']} ({estimate['failedSamples']} failed, {estimate['unsampledStrata']} groups without a usable sample)",
+    f"CPU time: {formatRange(estimate['cpuHours'], 'h')}",
+    f"Wall time with {estimate['workers']} workers: {formatRange(estimate['wallHours'], 'h')}",
+    f"Bytes saved: {formatRange(estimate['savedBytes'], 'GiB', gib)}"
+  ]
+  if not estimate['complete']:
+    lines.append(f"Incomplete: {estimate['unsampledFiles']} files ({estimate['unsampledBytes'] / gib:.2f} GiB) in {estimate['unsampledStrata']} groups had no usable sample and are not included above, check the log for the failed samples")
+  return '\n'.join(lines)
@@ -3,8 +3,7 @@ import shutil
 from datetime import datetime  # Import datetime for timestamps
 import logging  # Import logging module
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
 
 def moveUnpairedFiles(folder1, folder2, outputFolder):
   os.makedirs(outputFolder, exist_ok=True)  # Ensure the output folder exists
@@ -25,11 +24,11 @@ def moveUnpairedFiles(folder1, folder2, outputFolder):
       dst = os.path.join(outputFolder, file)  # Destination file path
       try:
         shutil.move(src, dst)  # Attempt to move the file
-        logging.info(f"Moved unpaired file from {folder1} to {outputFolder}: {file}")  # Log success
+        logger.info(f"Moved unpaired file from {folder1} to {outputFolder}: {file}")  # Log success
       except OSError:
         shutil.copy2(src, dst)  # Copy the file if move fails
         os.remove(src)  # Delete the original file
-        logging.info(f"Copied and removed unpaired file from {folder1} to {outputFolder}: {file}")  # Log fallback
+        logger.info(f"Copied and removed unpaired file from {folder1} to {outputFolder}: {file}")  # Log fallback
 
   for file in files2:
     baseName = os.path.splitext(file)[0]  # Get base name
@@ -38,13 +37,13 @@ def moveUnpairedFiles(folder1, folder2, outputFolder):
       dst = os.path.join(outputFolder, file)  # Destination file path
       try:
         shutil.move(src, dst)  # Attempt to move the file
-        logging.info(f"Moved unpaired file from {folder2} to {outputFolder}: {file}")  # Log success
+        logger.info(f"Moved unpaired file from {folder2} to {outputFolder}: {file}")  # Log success
       except OSError:
         shutil.copy2(src, dst)  # Copy the file if move fails
         os.remove(src)  # Delete the original file
-        logging.info(f"Copied and removed unpaired file from {folder2} to {outputFolder}: {file}")  # Log fallback
+        logger.info(f"Copied and removed unpaired file from {folder2} to {outputFolder}: {file}")  # Log fallback
 
-  logging.info(f"Unpaired files have been successfully moved to: {outputFolder}")  # Print completion message
+  logger.info(f"Unpaired files have been successfully moved to: {outputFolder}")  # Print completion message
 
 def handleFileConflict(filePath, outputFolder, movedFolder):
   """
@@ -77,4 +76,4 @@ def handleFileConflict(filePath, outputFolder, movedFolder):
     os.rmdir(conflictFolder)  # Remove the empty conflict folder
 
   if conflictDetected:
-    logging.info(f"Conflicting files moved to: {conflictFolder}")  # Print conflict resolution message
\ No newline at end of file
+    logger.info(f"Conflicting files moved to: {conflictFolder}")  # Print conflict resolution message
\ No newline at end of file
@@ -1,14 +1,12 @@
 import os
 import shutil
 from pathlib import Path
-from PIL import Image
 import subprocess
-from config import WEBP_QUALITY, MOVE_ORIGINALS_TO_BACKUP, LOG_FILE, CREATE_NO_WINDOW, LOG_METADATA  # Import shared constants
+from utils.settings_utils import resolveSettings, getCreationFlags  # Import per-call settings helpers
 from datetime import datetime  # Import datetime for timestamps
 import logging  # Import logging module
 
-# Configure logging
-logging.basicConfig(filename=LOG_FILE, level=logging.INFO, format='%(asctime)s %(message)s')
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
 
 def handleFileConflict(filePath, outputFolder, movedFolder):
   baseName = os.path.splitext(os.path.basename(filePath))[0]
@@ -32,9 +30,11 @@ def handleFileConflict(filePath, outputFolder, movedFolder):
     os.rmdir(conflictFolder)
 
   if conflictDetected:
-    logging.info(f"Conflicting files moved to: {conflictFolder}")  # Log conflict resolution message
+    logger.info(f"Conflicting files moved to: {conflictFolder}")  # Log conflict resolution message
 
-def processImage(imagePath, outputFolder, movedFolder):
+def processImage(imagePath, outputFolder, movedFolder, settings=None, copyMetadata=True):
+  settings = settings if settings is not None else resolveSettings()  # Fall back to the config.py defaults
+  creationFlags = getCreationFlags(settings)  # Hide command windows if requested
   filename = str(imagePath)
   filenameOut = os.path.join(outputFolder, f'{imagePath.stem}.webp')
   messages = []
@@ -46,8 +46,8 @@ def processImage(imagePath, outputFolder, movedFolder):
 
   try:
     subprocess.check_call(
-      ['cwebp', '-q', WEBP_QUALITY, filename, '-o', filenameOut],
-      creationflags=CREATE_NO_WINDOW,
+      ['cwebp', '-q', settings['webpQuality']] + (['-mt'] if settings['cwebpMultithread'] else []) + [filename, '-o', filenameOut],
+      creationflags=creationFlags,
       stdout=subprocess.DEVNULL,
       stderr=subprocess.DEVNULL
     )
@@ -55,10 +55,13 @@ def processImage(imagePath, outputFolder, movedFolder):
   except subprocess.CalledProcessError as e:
     status = 'error'
     messages.append(f"Error compressing image: {filename}: {e}")
-    return {'status': status, 'messages': messages, 'file': filename}
+    return {'status': status, 'messages': messages, 'file': filename, 'output': filenameOut}
 
-  if imagePath.suffix.lower() == '.png':
+  if imagePath.suffix.lower() == '.png' and not copyMetadata:
+    messages.append(f"Warning: exiftool not installed, metadata not copied to: {filenameOut}")  # The image itself is still usable
+  elif imagePath.suffix.lower() == '.png':
     try:
+      from PIL import Image  # Imported lazily, only PNG metadata needs Pillow
       with Image.open(filename) as im:
         userComment = im.info.get('parameters', '')
         prompt = im.info.get('prompt', '')
@@ -68,7 +71,7 @@ def processImage(imagePath, outputFolder, movedFolder):
         prompt = prompt.replace('"', '\\"')
         workflow = workflow.replace('"', '\\"')
 
-        if LOG_METADATA:
+        if settings['logMetadata']:
           messages.append(f"Metadata extracted for {filename}: parameters='{userComment}', prompt='{prompt}', workflow='{workflow}'")
 
       subprocess.check_call(
@@ -77,7 +80,7 @@ def processImage(imagePath, outputFolder, movedFolder):
          f'-Prompt={prompt}', 
          f'-Workflow={workflow}', 
          filenameOut],
-        creationflags=CREATE_NO_WINDOW,
+        creationflags=creationFlags,
         stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL
       )
@@ -96,7 +99,7 @@ def processImage(imagePath, outputFolder, movedFolder):
   if not os.path.exists(filenameOut):
     status = 'error'
     messages.append(f"Failed to create compressed file for: {filename}")
-    return {'status': status, 'messages': messages, 'file': filename}
+    return {'status': status, 'messages': messages, 'file': filename, 'output': filenameOut}
 
   originalSize = os.path.getsize(filename)
   compressedSize = os.path.getsize(filenameOut)
@@ -114,7 +117,7 @@ def processImage(imagePath, outputFolder, movedFolder):
       messages.append(f"Error updating timestamps for copied file {filenameOut}: {e}")
     messages.append(f"Compressed file larger than original, kept original: {filename}")
 
-  if MOVE_ORIGINALS_TO_BACKUP:
+  if settings['moveOriginalsToBackup']:
     try:
       os.makedirs(movedFolder, exist_ok=True)
       shutil.move(filename, os.path.join(movedFolder, os.path.basename(filename)))
@@ -123,4 +126,4 @@ def processImage(imagePath, outputFolder, movedFolder):
       status = 'error'
       messages.append(f"Error moving original image to backup: {filename}: {e}")
 
-  return {'status': status, 'messages': messages, 'file': filename}
\ No newline at end of file
+  return {'status': status, 'messages': messages, 'file': filename, 'output': filenameOut}
\ No newline at end of file
@@ -0,0 +1,131 @@
+import os
+import threading
+import logging  # Import logging module
+from collections import deque
+from concurrent.futures import Future
+
+from utils.video_utils import getVideoDimensions
+from utils.settings_utils import getCreationFlags
+
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
+
+def getTotalMemory():
+  try:
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')  # Physical memory on Linux/macOS
+  except (AttributeError, ValueError, OSError):
+    pass
+  try:
+    import ctypes  # Imported lazily, only needed on Windows
+
+    class MemoryStatus(ctypes.Structure):
+      _fields_ = [
+        ('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+        ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+        ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+        ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+        ('ullAvailExtendedVirtual', ctypes.c_ulonglong)
+      ]  # Layout of MEMORYSTATUSEX
+
+    status = MemoryStatus()
+    status.dwLength = ctypes.sizeof(MemoryStatus)
+    if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+      return status.ullTotalPhys  # Physical memory on Windows
+  except Exception:
+    pass
+  return None  # Unknown platform, the budget stays disabled
+
+def getMemoryBudget(settings):
+  budget = settings['memoryBudgetBytes']
+  if budget is None:
+    totalMemory = getTotalMemory()
+    if not totalMemory:
+      logger.warning('Total memory unknown, memory budget disabled')
+      return None
+    budget = int(totalMemory * settings['memoryBudgetFraction'])  # Leave room for the OS and other processes
+  return budget or None  # 0 disables the budget
+
+def estimateFootprint(filePath, settings, isImage, isVideo):
+  try:
+    if isImage:
+      from PIL import Image  # Imported lazily, only the header is read
+      with Image.open(filePath) as im:
+        width, height = im.size  # Lazy open parses the header without decoding
+      return settings['jobBaseBytes'] + width * height * settings['imageBytesPerPixel']
+    if isVideo:
+      width, height = getVideoDimensions(filePath, getCreationFlags(settings))  # Hide command windows like processVideo
+      if width and height:
+        return settings['jobBaseBytes'] + int(width * height * 1.5) * settings['videoFrameBuffers']  # YUV 4:2:0 frames held by the decoder and encoder
+  except Exception as e:
+    logger.error(f"Error reading dimensions of {filePath} for the memory estimate: {e}")
+  return settings['jobBaseBytes']  # Unknown size, count the fixed overhead only
+
+class MemoryBudget:
+  def __init__(self, budgetBytes):
+    self.budgetBytes = budgetBytes  # Projected bytes allowed in flight
+    self.usedBytes = 0  # Projected bytes of the admitted jobs
+    self.condition = threading.Condition()  # Guards the counters and the waiting queue
+    self.waiting = deque()  # Jobs that did not fit yet, in submission order
+    self.cancelled = False  # Set once the run is abandoned, nothing else is admitted
+    logger.info(f"Memory budget: {budgetBytes / 1024 ** 3:.2f} GiB")
+
+  def fits(self, cost):
+    return self.usedBytes == 0 or self.usedBytes + cost <= self.budgetBytes  # A job larger than the budget still runs alone
+
+  def submit(self, executor, cost, fn, *args):
+    future = Future()  # Completed once the job has been admitted and has finished
+    with self.condition:
+      self.waiting.append((cost, fn, args, future, executor))
+    self.drain()
+    return future
+
+  def drain(self):
+    admitted = []
+    with self.condition:
+      if self.cancelled:
+        return  # The executor is shutting down
+      # Admit every waiting job that fits, so small files keep flowing past a large one
+      for item in list(self.waiting):
+        if self.fits(item[0]):
+          self.usedBytes += item[0]
+          self.waiting.remove(item)
+          admitted.append(item)
+    for cost, fn, args, future, executor in admitted:
+      try:
+        inner = executor.submit(fn, *args)
+      except RuntimeError:
+        self.release(cost)  # The executor shut down while this job was being admitted
+        future.cancel()
+        continue
+      inner.add_done_callback(lambda done, cost=cost, future=future: self.finish(done, cost, future))
+
+  def finish(self, inner, cost, future):
+    self.release(cost)
+    self.drain()  # Admit waiting jobs before reporting, so the executor is still open
+    if inner.exception() is not None:
+      future.set_exception(inner.exception())
+    else:
+      future.set_result(inner.result())
+
+  def cancel(self):
+    with self.condition:
+      self.cancelled = True
+      waiting = list(self.waiting)
+      self.waiting.clear()  # Drop jobs that were never admitted
+    for _, _, _, future, _ in waiting:
+      future.cancel()
+
+  def release(self, cost):
+    with self.condition:
+      self.usedBytes -= cost
+      self.condition.notify_all()  # Wake jobs waiting in run()
+
+  def run(self, cost, fn, *args):
+    with self.condition:
+      while not self.fits(cost):
+        self.condition.wait()  # Wait for pooled jobs to finish
+      self.usedBytes += cost
+    try:
+      return fn(*args)
+    finally:
+      self.release(cost)
+      self.drain()
@@ -1,8 +1,10 @@
 import logging  # Import logging module
 from tqdm import tqdm
 
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
+
 def updateProgressBar(total, description):
-  logging.info('Progress bar updated')  # Log progress bar update
+  logger.info('Progress bar updated')  # Log progress bar update
   return tqdm(
     total=total,
     desc=description,
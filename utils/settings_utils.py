@@ -0,0 +1,54 @@
+import os
+import config  # Import shared constants used as defaults
+
+def getDefaultSettings():
+  return {
+    'webpQuality': config.WEBP_QUALITY,  # Quality for WebP compression
+    'crfWebm': config.CRF_WEBM,  # Constant Rate Factor for WebM
+    'webmBitrate': config.WEBM_BITRATE,  # Bitrate for WebM compression
+    'videoCodec': config.V_CODEC_WEBM,  # Video codec for WebM
+    'audioCodec': config.A_CODEC_WEBM,  # Audio codec for WebM
+    'scaleWidth': config.DEFAULT_SCALE_WIDTH,  # Width for scaling landscape videos
+    'scaleHeight': config.DEFAULT_SCALE_HEIGHT,  # Height for scaling portrait videos
+    'hideCmdWindows': config.HIDE_CMD_WINDOWS,  # Toggle to hide or show command prompt windows
+    'moveOriginalsToBackup': config.MOVE_ORIGINALS_TO_BACKUP,  # Move originals to the backup folder after processing
+    'logMetadata': config.LOG_METADATA,  # Include extracted PNG metadata in result messages
+    'useThreadPoolForImages': config.USE_THREAD_POOL_FOR_IMAGES,  # Run image jobs on the thread pool
+    'useThreadPoolForVideos': config.USE_THREAD_POOL_FOR_VIDEOS,  # Run video jobs on the thread pool
+    'maxWorkers': None,  # Thread pool size, None lets ThreadPoolExecutor decide
+    'cwebpMultithread': config.CWEBP_MULTITHREAD,  # Pass -mt to cwebp, None enables it when the probe reports support
+    'probeCapabilities': config.PROBE_CAPABILITIES,  # Pick encoders from probed tool capabilities before processing
+    'memoryBudgetBytes': config.MEMORY_BUDGET_BYTES,  # Projected memory allowed for running jobs, None picks a share of physical memory, 0 disables
+    'memoryBudgetFraction': config.MEMORY_BUDGET_FRACTION,  # Share of physical memory used when memoryBudgetBytes is None
+    'imageBytesPerPixel': config.IMAGE_BYTES_PER_PIXEL,  # Projected bytes per pixel of an image job
+    'videoFrameBuffers': config.VIDEO_FRAME_BUFFERS,  # Projected frames held in memory by a video job
+    'jobBaseBytes': config.JOB_BASE_BYTES,  # Fixed projected overhead of every job
+    'duplicatePolicy': config.DUPLICATE_POLICY,  # None, 'report' or 'lowerQuality' for near-duplicate images
+    'duplicateHash': config.DUPLICATE_HASH,  # 'phash' or 'dhash'
+    'duplicateMaxDistance': config.DUPLICATE_MAX_DISTANCE,  # Maximum Hamming distance for near-duplicates
+    'duplicateWebpQuality': config.DUPLICATE_WEBP_QUALITY,  # WebP quality for near-duplicates under 'lowerQuality'
+    'duplicateBatchSize': config.DUPLICATE_BATCH_SIZE,  # Thumbnails hashed per vectorized batch
+    'moveUnpairedFiles': True,  # Move unpaired files once every job of a folder is done
+    'stagingDir': config.STAGING_DIR,  # Local scratch folder for inputs on slow volumes, None processes in place
+    'stagingMaxBytes': config.STAGING_MAX_BYTES,  # Upper bound for bytes held in the scratch folder
+    'stagingReadAhead': config.STAGING_READ_AHEAD  # Number of inputs copied ahead of the encoders
+  }  # Settings dictionary built from the config.py constants
+
+def resolveSettings(settings=None):
+  resolved = getDefaultSettings()  # Start from the config.py defaults
+  if settings:
+    unknown = set(settings) - set(resolved)  # Find keys that do not map to any setting
+    if unknown:
+      raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")  # Reject typos instead of silently ignoring them
+    resolved.update(settings)  # Apply the per-call overrides
+  resolved['webpQuality'] = str(resolved['webpQuality'])  # cwebp expects the quality as a string argument
+  resolved['crfWebm'] = str(resolved['crfWebm'])  # ffmpeg expects the CRF as a string argument
+  resolved['duplicateWebpQuality'] = str(resolved['duplicateWebpQuality'])  # cwebp expects the quality as a string argument
+  if resolved['duplicatePolicy'] not in (None, 'report', 'lowerQuality'):
+    raise ValueError(f"Unknown duplicatePolicy: {resolved['duplicatePolicy']}")
+  if resolved['duplicateHash'] not in ('phash', 'dhash'):
+    raise ValueError(f"Unknown duplicateHash: {resolved['duplicateHash']}")
+  return resolved
+
+def getCreationFlags(settings):
+  return 0x08000000 if settings['hideCmdWindows'] and os.name == 'nt' else 0  # CREATE_NO_WINDOW only applies on Windows
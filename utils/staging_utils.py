@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+import threading
+import queue
+import logging  # Import logging module
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.file_utils import handleFileConflict
+
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
+
+class StagingArea:
+  def __init__(self, stagingDir, maxBytes, readAhead):
+    os.makedirs(stagingDir, exist_ok=True)  # Ensure the scratch root exists
+    self.scratchFolder = tempfile.mkdtemp(prefix='stage_', dir=stagingDir)  # Private scratch folder for this run
+    self.maxBytes = maxBytes  # Upper bound for bytes held in the scratch folder
+    self.readAhead = max(1, readAhead)  # Number of inputs that may wait in the scratch folder before being encoded
+    self.stagedBytes = 0  # Bytes currently held in the scratch folder
+    self.stagedCount = 0  # Inputs copied but not yet encoded
+    self.condition = threading.Condition()  # Guards the counters above
+    self.writer = ThreadPoolExecutor(max_workers=1)  # Single writer keeps the write-back sequential
+    self.stopped = threading.Event()  # Set when the run is abandoned, stops the prefetch thread
+    self.prefetchThread = None
+    logger.info(f"Staging inputs through: {self.scratchFolder}")
+
+  def reserve(self, size):
+    with self.condition:
+      # Wait for room, but always admit a file when the scratch folder is empty so oversized inputs still run
+      while self.stagedBytes > 0 and (self.stagedCount >= self.readAhead or self.stagedBytes + size > self.maxBytes) and not self.stopped.is_set():
+        self.condition.wait()
+      self.stagedBytes += size  # Account for the new input
+      self.stagedCount += 1
+
+  def release(self, size, count=0):
+    with self.condition:
+      self.stagedBytes -= size  # Give the bytes back to the budget
+      self.stagedCount -= count  # Give the read-ahead slot back
+      self.condition.notify_all()  # Wake the prefetch thread
+
+  def prefetch(self, filesToProcess, shouldStage):
+    ready = queue.Queue(maxsize=self.readAhead)  # Hand-off between the prefetch thread and the caller
+    done = object()  # Sentinel marking the end of the job list
+
+    def offer(item):
+      while not self.stopped.is_set():
+        try:
+          ready.put(item, timeout=0.1)  # Poll so a stop request is noticed while the caller is gone
+          return True
+        except queue.Full:
+          pass
+      return False
+
+    def worker():
+      for index, job in enumerate(filesToProcess):
+        if self.stopped.is_set():
+          return  # The run was abandoned, stop copying
+        filePath = job[0]
+        if not shouldStage(filePath):
+          offer((job, None))  # Unsupported files are passed through without copying
+          continue
+        try:
+          size = os.path.getsize(filePath)  # Size of the remote input
+          self.reserve(size)  # Block until the scratch budget allows another copy
+          if self.stopped.is_set():
+            return
+          stagedFolder = os.path.join(self.scratchFolder, str(index))  # One folder per job keeps the original file name
+          os.makedirs(stagedFolder, exist_ok=True)
+          stagedPath = os.path.join(stagedFolder, os.path.basename(filePath))
+          shutil.copy2(filePath, stagedPath)  # Sequential read from the slow volume, keeps timestamps
+          offer((job, (stagedPath, size)))
+        except Exception as e:
+          logger.error(f"Error staging {filePath}: {e}")  # Fall back to processing in place
+          offer((job, None))
+      offer(done)
+
+    self.prefetchThread = threading.Thread(target=worker, daemon=True)
+    self.prefetchThread.start()  # Copy upcoming inputs while the encoders run
+    while True:
+      item = ready.get()
+      if item is done:
+        break
+      yield item
+
+  def run(self, processFunction, job, staged, settings):
+    filePath, outputFolder, movedFolder, _ = job
+    stagedPath, inputSize = staged
+    stagedFolder = os.path.dirname(stagedPath)
+    localOutput = os.path.join(stagedFolder, 'out')  # Encoder output stays on the local disk
+    localSettings = dict(settings, moveOriginalsToBackup=False)  # The remote original is moved during write-back
+    os.makedirs(localOutput, exist_ok=True)  # cwebp and ffmpeg do not create the output folder
+    try:
+      result = processFunction(Path(stagedPath), localOutput, os.path.join(stagedFolder, 'moved'), localSettings)
+    finally:
+      if os.path.exists(stagedPath):
+        os.remove(stagedPath)  # The staged input is no longer needed
+      self.release(inputSize, count=1)
+    outputSize = os.path.getsize(result['output']) if result.get('output') and os.path.exists(result['output']) else 0
+    self.release(-outputSize)  # Keep the pending output in the budget until it is written back
+    return self.writer.submit(self.writeBack, result, job, stagedFolder, outputSize, settings)
+
+  def writeBack(self, result, job, stagedFolder, outputSize, settings):
+    filePath, outputFolder, movedFolder, _ = job
+    stagedPath = os.path.join(stagedFolder, os.path.basename(filePath))
+    localOutput = result.get('output')
+    hasOutput = bool(localOutput) and os.path.exists(localOutput)  # Only existing outputs are written back
+    remoteOutput = os.path.join(outputFolder, os.path.basename(localOutput)) if hasOutput else None
+    messages = [msg.replace(stagedPath, filePath) for msg in result['messages']]  # Report the remote input path
+    if hasOutput:
+      messages = [msg.replace(localOutput, remoteOutput) for msg in messages]  # Report the remote output path
+    status = result['status']
+
+    try:
+      if hasOutput:
+        if os.path.exists(remoteOutput) or os.path.exists(os.path.join(movedFolder, os.path.basename(filePath))):
+          handleFileConflict(filePath, outputFolder, movedFolder)  # Same conflict rules as in-place processing
+          messages.append(f"File conflict detected for: {filePath}")
+        os.makedirs(outputFolder, exist_ok=True)
+        shutil.copy2(localOutput, remoteOutput)  # One sequential write per output, keeps timestamps
+        messages.append(f"Staged output written back: {remoteOutput}")
+
+        if settings['moveOriginalsToBackup']:
+          os.makedirs(movedFolder, exist_ok=True)
+          shutil.move(filePath, os.path.join(movedFolder, os.path.basename(filePath)))  # Rename on the same volume, no data copied
+          messages.append(f"Original moved to backup: {filePath}")
+    except Exception as e:
+      status = 'error'
+      messages.append(f"Error writing back staged output for {filePath}: {e}")
+    finally:
+      shutil.rmtree(stagedFolder, ignore_errors=True)  # Free the local scratch space
+      self.release(outputSize)
+
+    return {'status': status, 'messages': messages, 'file': filePath, 'output': remoteOutput}
+
+  def stop(self):
+    self.stopped.set()  # Ask the prefetch thread to stop after the current copy
+    with self.condition:
+      self.condition.notify_all()  # Wake it if it waits for budget
+    if self.prefetchThread:
+      self.prefetchThread.join()  # It may still be copying into the scratch folder
+
+  def close(self):
+    if self.prefetchThread:
+      self.prefetchThread.join()  # Never delete the scratch folder under a running copy
+    self.writer.shutdown(wait=True)  # Wait for pending write-backs
+    shutil.rmtree(self.scratchFolder, ignore_errors=True)  # Remove the scratch folder for this run
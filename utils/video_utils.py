@@ -3,50 +3,50 @@ import shutil
 import subprocess
 import logging  # Import logging module
 from pathlib import Path
-from config import CRF_WEBM, HIDE_CMD_WINDOWS, MOVE_ORIGINALS_TO_BACKUP, LOG_FILE, CREATE_NO_WINDOW, DEFAULT_SCALE_WIDTH, DEFAULT_SCALE_HEIGHT, WEBM_BITRATE  # Use absolute import
+from config import CREATE_NO_WINDOW  # Use absolute import
+from utils.settings_utils import resolveSettings, getCreationFlags  # Import per-call settings helpers
 from datetime import datetime  # Import datetime for timestamps
 
-V_CODEC_WEBM = 'libvpx'  # Video codec for WebM
-A_CODEC_WEBM = 'libvorbis'  # Audio codec for WebM
+logger = logging.getLogger(__name__)  # Module logger, handlers are configured by main.py
 
-logging.basicConfig(filename=LOG_FILE, level=logging.INFO, format='%(asctime)s %(message)s')  # Configure logging
-
-def getVideoDimensions(videoPath):
+def getVideoDimensions(videoPath, creationFlags=CREATE_NO_WINDOW):
   try:
     result = subprocess.run(
       ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=width,height', '-of', 'csv=s=x:p=0', videoPath],
-      stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, creationflags=CREATE_NO_WINDOW
+      stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, creationflags=creationFlags
     )
     output = result.stdout.strip()
     dimensions = output.split('x')
     if len(dimensions) >= 2:
       return map(int, dimensions[:2])
   except Exception as e:
-    logging.error(f"Error getting dimensions for {videoPath}: {e}")
+    logger.error(f"Error getting dimensions for {videoPath}: {e}")
   return None, None
 
-def processVideo(videoPath, outputFolder, movedFolder):
+def processVideo(videoPath, outputFolder, movedFolder, settings=None):
+  settings = settings if settings is not None else resolveSettings()  # Fall back to the config.py defaults
+  creationFlags = getCreationFlags(settings)  # Hide command windows if requested
   filename = str(videoPath)
   filenameOut = os.path.join(outputFolder, f'{videoPath.stem}.webm')
   messages = []
   status = 'success'
 
-  width, height = getVideoDimensions(filename)
+  width, height = getVideoDimensions(filename, creationFlags)
   if width is None or height is None:
     status = 'error'
     messages.append(f"Error getting dimensions for video: {filename}")
-    return {'status': status, 'messages': messages, 'file': filename}
+    return {'status': status, 'messages': messages, 'file': filename, 'output': filenameOut}
 
-  scale = f'{DEFAULT_SCALE_WIDTH}:-2' if width > height else f'-2:{DEFAULT_SCALE_HEIGHT}'
+  scale = f"{settings['scaleWidth']}:-2" if width > height else f"-2:{settings['scaleHeight']}"
 
   try:
     subprocess.check_call(
       [
         'ffmpeg', '-y', '-i', filename, '-vf', f'scale={scale}',
-        '-c:v', V_CODEC_WEBM, '-crf', CRF_WEBM, '-b:v', WEBM_BITRATE, '-c:a', A_CODEC_WEBM,
+        '-c:v', settings['videoCodec'], '-crf', settings['crfWebm'], '-b:v', settings['webmBitrate'], '-c:a', settings['audioCodec'],
         filenameOut
       ],
-      creationflags=CREATE_NO_WINDOW,
+      creationflags=creationFlags,
       stdout=subprocess.DEVNULL,
       stderr=subprocess.DEVNULL
     )
@@ -63,7 +63,7 @@ def processVideo(videoPath, outputFolder, movedFolder):
   except subprocess.CalledProcessError as e:
     status = 'error'
     messages.append(f"Error compressing video: {filename}: {e}")
-    return {'status': status, 'messages': messages, 'file': filename}
+    return {'status': status, 'messages': messages, 'file': filename, 'output': filenameOut}
 
   originalSize = os.path.getsize(filename)
   compressedSize = os.path.getsize(filenameOut)
@@ -83,7 +83,7 @@ def processVideo(videoPath, outputFolder, movedFolder):
   else:
     messages.append(f"Compressed video is smaller, kept compressed: {filename}")
 
-  if MOVE_ORIGINALS_TO_BACKUP:
+  if settings['moveOriginalsToBackup']:
     try:
       os.makedirs(movedFolder, exist_ok=True)
       shutil.move(filename, movedFolder)
@@ -92,4 +92,4 @@ def processVideo(videoPath, outputFolder, movedFolder):
       status = 'error'
       messages.append(f"Error moving original video to backup: {filename}: {e}")
 
-  return {'status': status, 'messages': messages, 'file': filename}
\ No newline at end of file
+  return {'status': status, 'messages': messages, 'file': filename, 'output': filenameOut}
\ No newline at end of file